@@ -4,19 +4,26 @@ Compares training data (reference) against test/production data to detect distri
 """
 import pandas as pd
 import numpy as np
-from scipy.stats import ks_2samp, chi2_contingency
-import joblib
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from scipy.stats import chi2_contingency, ks_2samp
+from scipy.stats.distributions import kstwo
+from joblib import Parallel, delayed
+import argparse
+import math
 import os
+from functools import lru_cache
 import warnings
+from numba import njit
 from sklearn.model_selection import train_test_split
 
-# Import feature definitions from train.py to ensure consistency
-from train import (
+# Import feature definitions from the shared config to ensure consistency.
+# train_config has no TensorFlow imports, so this script starts quickly.
+from train_config import (
     DATA_FILE_PATH,
     ENV_FEATURES,
     WEARABLE_FEATURES,
     TEXT_FEATURE,
-    TARGET,
     CLIENT_CITIES,
 )
 
@@ -25,7 +32,19 @@ warnings.filterwarnings('ignore')
 
 # Configuration
 P_VALUE_THRESHOLD = 0.05
-REFERENCE_STATS_FILE = "model/reference_stats.joblib"
+REFERENCE_STATS_FILE = "model/reference_stats.npz"
+QUICK_FEATURES = ['pm2_5', 'occupancy_ratio', 'heart_rate', 'respiratory_rate']
+SKETCH_SIZE = 1024  # Quantiles stored per feature in place of the raw data
+KS_EXACT_MAX_N = 10000  # Largest sample ks_2samp computes exact p-values for
+NUMERIC_STATS_DTYPE = [
+    ('feature', 'U32'),
+    ('mean', 'f8'),
+    ('std', 'f8'),
+    ('min', 'f8'),
+    ('max', 'f8'),
+    ('median', 'f8'),
+    ('count', 'i8'),
+]
 
 
 def calculate_reference_statistics(df_train):
@@ -35,73 +54,216 @@ def calculate_reference_statistics(df_train):
     """
     stats = {}
     
-    # Numerical features (ENV + WEARABLE)
+    # Numerical features (ENV + WEARABLE): order stats from one .agg call
     all_numerical_features = ENV_FEATURES + WEARABLE_FEATURES
-    
-    for feature in all_numerical_features:
-        if feature in df_train.columns:
-            stats[feature] = {
-                'mean': float(df_train[feature].mean()),
-                'std': float(df_train[feature].std()),
-                'min': float(df_train[feature].min()),
-                'max': float(df_train[feature].max()),
-                'median': float(df_train[feature].median()),
-                'data': df_train[feature].values.tolist()  # For KS test
-            }
+    numerical = [f for f in all_numerical_features if f in df_train.columns]
+    summary = df_train[numerical].agg(['min', 'max', 'median', 'count'])
+    
+    # pandas sums float32 columns in float32, so take mean/std from the
+    # float64-accumulating kernel instead (sample std, as pandas reports)
+    means, stds = _nan_mean_std(df_train[numerical].to_numpy().T)
+    counts = summary.loc['count'].to_numpy(dtype=np.float64)
+    stds = stds * np.sqrt(counts / np.maximum(counts - 1, 1))
+    
+    for i, feature in enumerate(numerical):
+        column = summary[feature]
+        stats[feature] = {
+            'mean': float(means[i]),
+            'std': float(stds[i]),
+            'min': float(column['min']),
+            'max': float(column['max']),
+            'median': float(column['median']),
+            'count': int(column['count']),
+            # Fixed-size stand-in for the training data in the KS test
+            'quantile_sketch': np.quantile(
+                df_train[feature].dropna().values, np.linspace(0, 1, SKETCH_SIZE)
+            ).astype(np.float32),
+        }
     
     # Categorical feature (TEXT_FEATURE)
     if TEXT_FEATURE in df_train.columns:
         stats[TEXT_FEATURE] = {
-            'value_counts': df_train[TEXT_FEATURE].value_counts().to_dict()
+            'value_counts': {
+                category: int(count)
+                for category, count in df_train[TEXT_FEATURE].value_counts().items()
+                if count > 0
+            }
         }
     
     return stats
 
 
 def save_reference_statistics(stats, filepath=REFERENCE_STATS_FILE):
-    """Save reference statistics to a file."""
+    """
+    Save reference statistics to a compressed .npz file.
+    Numerical features go into one structured table plus a (features, SKETCH_SIZE)
+    sketch matrix, and the categorical counts into two parallel arrays.
+    """
     os.makedirs(os.path.dirname(filepath) if os.path.dirname(filepath) else '.', exist_ok=True)
-    joblib.dump(stats, filepath)
+    numerical = [feature for feature in stats if feature != TEXT_FEATURE]
+    numeric_stats = np.array(
+        [
+            (feature, *(stats[feature][field] for field, _ in NUMERIC_STATS_DTYPE[1:]))
+            for feature in numerical
+        ],
+        dtype=NUMERIC_STATS_DTYPE,
+    )
+    sketches = np.array(
+        [stats[feature]['quantile_sketch'] for feature in numerical], dtype=np.float32
+    ).reshape(len(numerical), SKETCH_SIZE)
+    value_counts = stats.get(TEXT_FEATURE, {}).get('value_counts', {})
+    np.savez_compressed(
+        filepath,
+        numeric_stats=numeric_stats,
+        sketches=sketches,
+        categories=np.array(list(value_counts), dtype=str),
+        category_counts=np.array(list(value_counts.values()), dtype=np.int64),
+    )
     print(f"✅ Reference statistics saved to {filepath}")
 
 
 def load_reference_statistics(filepath=REFERENCE_STATS_FILE):
-    """Load reference statistics from a file."""
+    """Load reference statistics saved by save_reference_statistics."""
     if not os.path.exists(filepath):
         return None
-    return joblib.load(filepath)
+    with np.load(filepath) as data:
+        stats = {
+            str(row['feature']): {
+                **{field: row[field].item() for field, _ in NUMERIC_STATS_DTYPE[1:]},
+                'quantile_sketch': sketch,
+            }
+            for row, sketch in zip(data['numeric_stats'], data['sketches'])
+        }
+        if len(data['categories']):
+            stats[TEXT_FEATURE] = {
+                'value_counts': dict(
+                    zip(data['categories'].tolist(), data['category_counts'].tolist())
+                )
+            }
+    return stats
+
+
+def _stack_padded(arrays):
+    """Stack 1-D arrays of different lengths into rows, padding with NaN."""
+    width = max(len(a) for a in arrays)
+    mat = np.full((len(arrays), width), np.nan, dtype=np.result_type(np.float32, *arrays))
+    for i, a in enumerate(arrays):
+        mat[i, : len(a)] = a
+    return mat
 
 
-def detect_numerical_drift(reference_data, new_data, feature_name):
+@njit(cache=True)
+def _nan_mean_std(mat):
     """
-    Detect drift in numerical features using Kolmogorov-Smirnov test.
-    Returns (drifted, ks_statistic, p_value, summary_stats)
+    Mean and population std of each row, ignoring NaN, in a single pass
+    (Welford's update, accumulated in float64).
+    fastmath is left off because it would let the NaN checks be optimized away.
     """
-    ks_statistic, p_value = ks_2samp(reference_data, new_data)
-    
-    ref_mean = np.mean(reference_data)
-    ref_std = np.std(reference_data)
-    new_mean = np.mean(new_data)
-    new_std = np.std(new_data)
-    
-    mean_shift = abs(new_mean - ref_mean) / (ref_std + 1e-8)  # Normalized shift
-    std_shift = abs(new_std - ref_std) / (ref_std + 1e-8)
-    
-    drifted = p_value < P_VALUE_THRESHOLD
-    
-    summary = {
-        'drifted': drifted,
-        'ks_statistic': float(ks_statistic),
-        'p_value': float(p_value),
-        'ref_mean': float(ref_mean),
-        'ref_std': float(ref_std),
-        'new_mean': float(new_mean),
-        'new_std': float(new_std),
-        'mean_shift': float(mean_shift),
-        'std_shift': float(std_shift),
-    }
-    
-    return drifted, summary
+    n_rows = mat.shape[0]
+    means = np.empty(n_rows)
+    stds = np.empty(n_rows)
+    for r in range(n_rows):
+        count = 0
+        mean = 0.0
+        m2 = 0.0
+        for j in range(mat.shape[1]):
+            v = np.float64(mat[r, j])
+            if np.isnan(v):
+                continue
+            count += 1
+            delta = v - mean
+            mean += delta / count
+            m2 += delta * (v - mean)
+        means[r] = mean if count else np.nan
+        stds[r] = math.sqrt(m2 / count) if count else np.nan
+    return means, stds
+
+
+def _ks_presorted(ref_sorted, new_data, ref_size=None):
+    """
+    Two-sample Kolmogorov-Smirnov test against an already sorted reference
+    sample, so only new_data is sorted here. ref_size gives the true
+    reference sample size when ref_sorted is a quantile sketch.
+    Returns (ks_statistic, p_value).
+    """
+    new_sorted = np.sort(new_data)
+    n_ref = len(ref_sorted) if ref_size is None else ref_size
+    n_new = len(new_sorted)
+    
+    # Small raw samples get ks_2samp's exact p-value, which the asymptotic
+    # formula below only approximates; re-sorting samples this size is cheap
+    if n_ref == len(ref_sorted) and max(n_ref, n_new) <= KS_EXACT_MAX_N:
+        result = ks_2samp(ref_sorted, new_sorted)
+        return result.statistic, result.pvalue
+    
+    # Both empirical CDFs evaluated at every observed value
+    all_values = np.concatenate([ref_sorted, new_sorted])
+    cdf_ref = np.searchsorted(ref_sorted, all_values, side='right') / len(ref_sorted)
+    cdf_new = np.searchsorted(new_sorted, all_values, side='right') / len(new_sorted)
+    ks_statistic = np.max(np.abs(cdf_ref - cdf_new))
+    
+    # Asymptotic p-value, as ks_2samp uses once the larger sample has more
+    # than KS_EXACT_MAX_N values. A quantile sketch only approximates the
+    # statistic, so sketched references use it at every size.
+    en = round(n_ref * n_new / (n_ref + n_new))
+    p_value = min(max(kstwo.sf(ks_statistic, en), 0.0), 1.0)
+    return ks_statistic, p_value
+
+
+def detect_numerical_drift(reference_data, new_data, feature_names, reference_sizes=None,
+                           reference_moments=None):
+    """
+    Detect drift in numerical features using Kolmogorov-Smirnov tests.
+    reference_data and new_data are lists of 1-D arrays, one per feature;
+    each reference array must already be sorted. reference_sizes holds the
+    original sample sizes when reference_data are quantile sketches, and
+    reference_moments their exact (mean, population std), since a sketch
+    only approximates the distribution's moments.
+    Returns a dictionary of summary stats per feature.
+    """
+    if reference_sizes is None:
+        reference_sizes = [None] * len(feature_names)
+    if reference_moments is None:
+        reference_moments = [None] * len(feature_names)
+
+    # One test per thread; NumPy releases the GIL while sorting and
+    # searching, so this scales across cores.
+    ks_results = Parallel(n_jobs=-1, prefer='threads')(
+        delayed(_ks_presorted)(ref_sorted, new, ref_size)
+        for ref_sorted, new, ref_size in zip(reference_data, new_data, reference_sizes)
+    )
+    ks_statistics = np.array([ks for ks, _ in ks_results])
+    p_values = np.array([p for _, p in ks_results])
+
+    ref_mat = _stack_padded(reference_data)
+    new_mat = _stack_padded(new_data)
+
+    ref_mean, ref_std = _nan_mean_std(ref_mat)
+    new_mean, new_std = _nan_mean_std(new_mat)
+    for i, moments in enumerate(reference_moments):
+        if moments is not None:
+            ref_mean[i], ref_std[i] = moments
+
+    mean_shift = np.abs(new_mean - ref_mean) / (ref_std + 1e-8)  # Normalized shift
+    std_shift = np.abs(new_std - ref_std) / (ref_std + 1e-8)
+
+    drifted = p_values < P_VALUE_THRESHOLD
+
+    results = {}
+    for i, feature in enumerate(feature_names):
+        results[feature] = {
+            'drifted': bool(drifted[i]),
+            'ks_statistic': float(ks_statistics[i]),
+            'p_value': float(p_values[i]),
+            'ref_mean': float(ref_mean[i]),
+            'ref_std': float(ref_std[i]),
+            'new_mean': float(new_mean[i]),
+            'new_std': float(new_std[i]),
+            'mean_shift': float(mean_shift[i]),
+            'std_shift': float(std_shift[i]),
+        }
+
+    return results
 
 
 def detect_categorical_drift(reference_counts, new_data, feature_name):
@@ -109,17 +271,27 @@ def detect_categorical_drift(reference_counts, new_data, feature_name):
     Detect drift in categorical features using Chi-square test.
     Returns (drifted, chi2_statistic, p_value, summary_stats)
     """
-    # Get value counts for new data
-    new_counts = pd.Series(new_data).value_counts().to_dict()
-    
-    # Create contingency table
-    all_categories = set(reference_counts.keys()) | set(new_counts.keys())
-    
-    # Build contingency table
-    ref_values = [reference_counts.get(cat, 0) for cat in all_categories]
-    new_values = [new_counts.get(cat, 0) for cat in all_categories]
-    
-    contingency = np.array([ref_values, new_values])
+    # Encode the new data as integer codes over the union of categories so
+    # its counts are a single np.bincount instead of a value_counts dict
+    ref_series = pd.Series(reference_counts)
+    new_data = pd.Series(new_data, copy=False)
+    if isinstance(new_data.dtype, pd.CategoricalDtype):
+        new_categories = new_data.cat.categories
+    else:
+        new_categories = pd.Index(new_data.dropna().unique())
+    all_categories = ref_series.index.union(new_categories)
+    codes = pd.Categorical(new_data, categories=all_categories).codes
+    new_row = np.bincount(codes[codes >= 0], minlength=len(all_categories))
+    ref_row = ref_series.reindex(all_categories, fill_value=0).to_numpy()
+    
+    # Build contingency table, dropping categories seen in neither sample
+    seen = (ref_row > 0) | (new_row > 0)
+    contingency = np.vstack([ref_row[seen], new_row[seen]])
+    new_counts = {
+        category: int(count)
+        for category, count in zip(all_categories[seen], new_row[seen])
+        if count > 0
+    }
     
     # Perform chi-square test
     try:
@@ -140,9 +312,11 @@ def detect_categorical_drift(reference_counts, new_data, feature_name):
         return False, {'error': str(e)}
 
 
-def run_drift_detection(df_reference, df_new, reference_stats=None):
+def run_drift_detection(df_reference, df_new, reference_stats=None, features=None,
+                        check_categorical=True):
     """
     Run drift detection comparing reference (training) data against new (test/production) data.
+    features limits the numerical features checked (default: all of them).
     """
     print("=" * 60)
     print("Running Drift Detection")
@@ -152,31 +326,70 @@ def run_drift_detection(df_reference, df_new, reference_stats=None):
     any_drift = False
     
     # Check numerical features
-    all_numerical_features = ENV_FEATURES + WEARABLE_FEATURES
+    all_numerical_features = features or ENV_FEATURES + WEARABLE_FEATURES
     
     print(f"\n📊 Checking {len(all_numerical_features)} numerical features...")
     print("-" * 60)
     
+    # Pull every numerical column out of each frame once, as float32
+    present_features = [
+        f for f in all_numerical_features
+        if f in df_reference.columns and f in df_new.columns
+    ]
+    column_of = {feature: i for i, feature in enumerate(present_features)}
+    ref_mat = df_reference[present_features].to_numpy(dtype=np.float32)
+    new_mat = df_new[present_features].to_numpy(dtype=np.float32)
+    
+    tested_features = []
+    ref_arrays = []
+    ref_sizes = []
+    ref_moments_list = []
+    new_arrays = []
     for feature in all_numerical_features:
-        if feature not in df_reference.columns or feature not in df_new.columns:
+        if feature not in column_of:
             print(f"⚠️  Feature '{feature}' not found in data, skipping...")
             continue
         
-        reference_data = df_reference[feature].dropna()
-        new_data = df_new[feature].dropna()
+        reference_data = ref_mat[:, column_of[feature]]
+        reference_data = reference_data[~np.isnan(reference_data)]
+        new_data = new_mat[:, column_of[feature]]
+        new_data = new_data[~np.isnan(new_data)]
         
         if len(reference_data) == 0 or len(new_data) == 0:
             print(f"⚠️  Feature '{feature}' has no valid data, skipping...")
             continue
         
-        # Use reference stats if available, otherwise use actual data
-        if reference_stats and feature in reference_stats:
-            ref_data_for_test = np.array(reference_stats[feature]['data'])
+        # Use the saved quantile sketch (sorted by construction) if available,
+        # otherwise sort the actual data once
+        if reference_stats and 'quantile_sketch' in reference_stats.get(feature, {}):
+            feature_stats = reference_stats[feature]
+            ref_data_for_test = feature_stats['quantile_sketch']
+            ref_size = feature_stats['count']
+            # The saved std is the sample std; the drift summary uses the
+            # population std, as computed for the new data
+            ref_moments = (
+                feature_stats['mean'],
+                feature_stats['std'] * math.sqrt(max(ref_size - 1, 1) / ref_size),
+            )
         else:
-            ref_data_for_test = reference_data.values
-        
-        drifted, summary = detect_numerical_drift(ref_data_for_test, new_data.values, feature)
+            ref_data_for_test = np.sort(reference_data)
+            ref_size = len(ref_data_for_test)
+            ref_moments = None
         
+        tested_features.append(feature)
+        ref_arrays.append(ref_data_for_test)
+        ref_sizes.append(ref_size)
+        ref_moments_list.append(ref_moments)
+        new_arrays.append(new_data)
+    
+    numerical_results = {}
+    if tested_features:
+        numerical_results = detect_numerical_drift(
+            ref_arrays, new_arrays, tested_features, ref_sizes, ref_moments_list
+        )
+    
+    for feature, summary in numerical_results.items():
+        drifted = summary['drifted']
         drift_results[feature] = summary
         any_drift = any_drift or drifted
         
@@ -190,7 +403,8 @@ def run_drift_detection(df_reference, df_new, reference_stats=None):
         print(f"  Mean Shift: {summary['mean_shift']:.2f}σ, Std Shift: {summary['std_shift']:.2f}σ")
     
     # Check categorical feature
-    if TEXT_FEATURE in df_reference.columns and TEXT_FEATURE in df_new.columns:
+    if (check_categorical and TEXT_FEATURE in df_reference.columns
+            and TEXT_FEATURE in df_new.columns):
         print(f"\n📋 Checking categorical feature: '{TEXT_FEATURE}'...")
         print("-" * 60)
         
@@ -219,8 +433,98 @@ def run_drift_detection(df_reference, df_new, reference_stats=None):
     return drift_results, any_drift
 
 
-def main():
+@lru_cache(maxsize=None)
+def load_drift_data(filepath=DATA_FILE_PATH):
+    """
+    Read only the columns drift detection uses, with pyarrow's multi-threaded
+    CSV parser. Numerics come back as float32 and strings as pandas
+    categories (a shared category index lets the Chi² test count integer codes).
+    The frame is cached per path, so treat it as read-only.
+    """
+    numerical_features = ENV_FEATURES + WEARABLE_FEATURES
+    category = pa.dictionary(pa.int32(), pa.string())
+    column_types = {feature: pa.float32() for feature in numerical_features}
+    column_types[TEXT_FEATURE] = category
+    column_types['city'] = category
+    table = pacsv.read_csv(
+        filepath,
+        read_options=pacsv.ReadOptions(encoding='latin1'),
+        convert_options=pacsv.ConvertOptions(
+            column_types=column_types,
+            include_columns=numerical_features + [TEXT_FEATURE, 'city'],
+        ),
+    )
+    return table.to_pandas()
+
+
+def split_data(df, split='city'):
+    """
+    Split data 80/20 into (train, test) frames.
+    'city' repeats train.py's per-city split, so the reference matches the
+    training data; 'random' splits all rows at once; 'timeorder' keeps the
+    first 80% of rows as the reference and the rest as new data.
+    """
+    if split == 'timeorder':
+        n_train = int(len(df) * 0.8)
+        return df.iloc[:n_train], df.iloc[n_train:]
+    
+    if split == 'random':
+        train_positions, test_positions = train_test_split(
+            np.arange(len(df)), test_size=0.2, random_state=42
+        )
+        return df.take(train_positions), df.take(test_positions)
+    
+    # Group row positions by city in a single pass, then split each city
+    # exactly as train.py does so the reference matches the training data.
+    city_positions = df.groupby('city', sort=False, observed=True).indices
+    train_positions = []
+    test_positions = []
+    
+    for city in CLIENT_CITIES:
+        positions = city_positions.get(city)
+        if positions is None:
+            continue
+        
+        train_indices, test_indices = train_test_split(
+            np.arange(len(positions)), test_size=0.2, random_state=42
+        )
+        train_positions.append(positions[train_indices])
+        test_positions.append(positions[test_indices])
+    
+    # Gather rows by position; take returns new frames, so no label lookup
+    # or extra copy is needed
+    return (
+        df.take(np.concatenate(train_positions)),
+        df.take(np.concatenate(test_positions)),
+    )
+
+
+def main(argv=None):
     """Main function to run drift detection."""
+    parser = argparse.ArgumentParser(description="Data drift detection")
+    parser.add_argument(
+        "--features",
+        nargs="+",
+        default=None,
+        help="Numerical features to check (default: all of them)",
+    )
+    parser.add_argument(
+        "--split",
+        choices=["city", "random", "timeorder"],
+        default="city",
+        help="How to split reference/new data (default: city, as in train.py)",
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help=f"Time-ordered split on {', '.join(QUICK_FEATURES)} only, "
+             "without the categorical check or saved reference statistics",
+    )
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.split = "timeorder"
+        args.features = args.features or QUICK_FEATURES
+    
     print("=" * 60)
     print("Data Drift Detection Script")
     print("=" * 60)
@@ -229,61 +533,48 @@ def main():
     # Load data
     print("📁 Loading data...")
     try:
-        df = pd.read_csv(DATA_FILE_PATH, encoding='latin1')
+        df = load_drift_data()
         print(f"✅ Loaded {len(df)} rows from {DATA_FILE_PATH}")
     except Exception as e:
         print(f"❌ Error loading data: {e}")
         return
     
-    # Check if reference statistics exist
-    reference_stats = load_reference_statistics()
+    # Check if reference statistics exist. They describe the city split's
+    # training data, so other splits compare against their own reference.
+    use_saved_stats = args.split == "city"
+    reference_stats = load_reference_statistics() if use_saved_stats else None
     
     if reference_stats:
         print(f"✅ Loaded reference statistics from {REFERENCE_STATS_FILE}")
         print("   Using saved training data statistics as reference.")
         # We still need to load training data for comparison
         # But we'll use the saved stats for the actual tests
-    else:
+    elif use_saved_stats:
         print("ℹ️  No saved reference statistics found.")
         print("   Will calculate from training data split.")
     
-    # Split data into train/test (same logic as train.py)
-    print("\n📊 Splitting data (80% train, 20% test)...")
-    
-    # For each city, split the data
-    all_train_indices = []
-    all_test_indices = []
-    
-    for city in CLIENT_CITIES:
-        city_df = df[df['city'] == city].copy()
-        if len(city_df) == 0:
-            continue
-        
-        indices = np.arange(len(city_df))
-        train_indices, test_indices = train_test_split(
-            indices, test_size=0.2, random_state=42
-        )
-        
-        # Map back to original dataframe indices
-        city_start_idx = city_df.index[0]
-        all_train_indices.extend(city_df.index[train_indices])
-        all_test_indices.extend(city_df.index[test_indices])
-    
-    df_train = df.loc[all_train_indices].copy()
-    df_test = df.loc[all_test_indices].copy()
+    # Split data into train/test
+    print(f"\n📊 Splitting data by {args.split} (80% train, 20% test)...")
+    df_train, df_test = split_data(df, args.split)
     
     print(f"✅ Training data: {len(df_train)} rows")
     print(f"✅ Test data: {len(df_test)} rows")
     
     # Calculate and save reference statistics if not already saved
-    if not reference_stats:
+    if use_saved_stats and not reference_stats:
         print("\n📊 Calculating reference statistics from training data...")
         reference_stats = calculate_reference_statistics(df_train)
         save_reference_statistics(reference_stats)
     
     # Run drift detection
     print("\n" + "=" * 60)
-    drift_results, any_drift = run_drift_detection(df_train, df_test, reference_stats)
+    drift_results, any_drift = run_drift_detection(
+        df_train,
+        df_test,
+        reference_stats,
+        features=args.features,
+        check_categorical=not args.quick,
+    )
     
     # Print summary
     print("\n" + "=" * 60)
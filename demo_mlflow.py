@@ -4,9 +4,12 @@ Run this to see how MLflow tracks experiments.
 """
 import mlflow
 import mlflow.keras
+from mlflow.entities import Metric
+from mlflow.tracking import MlflowClient
 import numpy as np
 from datetime import datetime
 import os
+import time
 
 # Set experiment
 mlflow.set_experiment("mlflow-demo")
@@ -21,27 +24,35 @@ with mlflow.start_run(run_name=f"demo_run_{datetime.now().strftime('%Y%m%d_%H%M%
     
     # Log some parameters
     print("   Logging parameters...")
-    mlflow.log_param("demo_type", "example")
-    mlflow.log_param("random_seed", 42)
-    mlflow.log_param("sample_size", 1000)
+    mlflow.log_params({
+        "demo_type": "example",
+        "random_seed": 42,
+        "sample_size": 1000,
+    })
     
     # Simulate some metrics (like training)
+    # Collect every epoch's metrics and send them in one log_batch call
+    # instead of one tracking-store round trip per value
     print("   Logging metrics...")
+    run_id = mlflow.active_run().info.run_id
+    epoch_metrics = []
     for epoch in range(5):
         # Simulate training metrics
         train_loss = 10.0 - (epoch * 1.5) + np.random.normal(0, 0.2)
         val_loss = 10.5 - (epoch * 1.4) + np.random.normal(0, 0.3)
         
-        mlflow.log_metric("train_loss", train_loss, step=epoch)
-        mlflow.log_metric("val_loss", val_loss, step=epoch)
+        timestamp = int(time.time() * 1000)
+        epoch_metrics.append(Metric("train_loss", train_loss, timestamp, epoch))
+        epoch_metrics.append(Metric("val_loss", val_loss, timestamp, epoch))
         print(f"      Epoch {epoch+1}: train_loss={train_loss:.3f}, val_loss={val_loss:.3f}")
     
+    MlflowClient().log_batch(run_id, metrics=epoch_metrics)
+    
     # Log final metrics
     final_mae = 2.5 + np.random.normal(0, 0.1)
     final_r2 = 0.85 + np.random.normal(0, 0.02)
     
-    mlflow.log_metric("final_mae", final_mae)
-    mlflow.log_metric("final_r2", final_r2)
+    mlflow.log_metrics({"final_mae": final_mae, "final_r2": final_r2})
     
     print(f"\n   Final Metrics:")
     print(f"      MAE: {final_mae:.4f}")
@@ -61,7 +72,6 @@ with mlflow.start_run(run_name=f"demo_run_{datetime.now().strftime('%Y%m%d_%H%M%
     print("   ✅ Artifact logged")
     
     # Get run info
-    run_id = mlflow.active_run().info.run_id
     print(f"\n✅ Run completed!")
     print(f"   Run ID: {run_id}")
     print(f"   Experiment: mlflow-demo")
@@ -0,0 +1,122 @@
+"""
+ONNX Export Script
+Converts the saved Keras model to ONNX so app.py can serve it with ONNX Runtime.
+Pass --quantize to store INT8 (dynamic range) weights instead of FP32.
+"""
+import argparse
+import os
+import sys
+import numpy as np
+import onnx
+import onnxruntime as ort
+import tensorflow as tf
+from tensorflow import keras
+import tf2onnx
+
+from train_config import ENV_FEATURES, IMG_SHAPE, POPULATION_CLASSES
+
+KERAS_MODEL_PATH = "model/health_model.keras"
+ONNX_MODEL_PATH = "model/health_model.onnx"
+ONNX_FP32_MODEL_PATH = "model/health_model.fp32.onnx"
+ONNX_OPSET = 17
+
+# Random samples the exported model is checked on, and the largest absolute
+# difference from the Keras outputs that is accepted
+CHECK_SAMPLES = 64
+CHECK_ATOL = 1e-4
+
+
+def export_to_onnx(keras_path=KERAS_MODEL_PATH, onnx_path=ONNX_MODEL_PATH):
+    """Convert a saved Keras model to ONNX, keeping the Keras input names."""
+    model = keras.models.load_model(keras_path, compile=False)
+
+    input_signature = (
+        tf.TensorSpec((None, len(ENV_FEATURES)), tf.float32, name="env_input"),
+        tf.TensorSpec((None, 1), tf.float32, name="text_input"),
+        tf.TensorSpec((None,) + IMG_SHAPE, tf.float32, name="wearable_image_input"),
+    )
+
+    # Convert a tf.function around the forward pass rather than the model
+    # itself; tf2onnx.convert.from_keras does not handle Keras 3 models
+    @tf.function(input_signature=input_signature)
+    def forward(env_input, text_input, wearable_image_input):
+        return model([env_input, text_input, wearable_image_input], training=False)
+
+    model_proto, _ = tf2onnx.convert.from_function(
+        forward,
+        input_signature=input_signature,
+        opset=ONNX_OPSET,
+    )
+
+    # Tell app.py whether the model scales its own inputs (scalers folded
+    # in as Normalization layers) or expects pre-scaled features
+    normalizes_inputs = any(
+        layer.name == "env_normalization" for layer in model.layers
+    )
+    onnx.helper.set_model_props(
+        model_proto, {"normalizes_inputs": str(normalizes_inputs).lower()}
+    )
+    onnx.save(model_proto, onnx_path)
+    print(f"✅ ONNX model saved to {onnx_path}")
+
+    check_onnx_matches_keras(model, onnx_path)
+
+
+def check_onnx_matches_keras(model, onnx_path, n_samples=CHECK_SAMPLES):
+    """
+    Run the Keras model and the exported ONNX model on the same random batch
+    and raise if any output differs by more than CHECK_ATOL.
+    """
+    rng = np.random.default_rng(0)
+    inputs = {
+        "env_input": rng.standard_normal((n_samples, len(ENV_FEATURES)), dtype=np.float32),
+        "text_input": rng.integers(
+            0, len(POPULATION_CLASSES), (n_samples, 1)
+        ).astype(np.float32),
+        "wearable_image_input": rng.standard_normal(
+            (n_samples,) + IMG_SHAPE, dtype=np.float32
+        ),
+    }
+
+    expected = np.asarray(model(list(inputs.values()), training=False))
+    session = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+    actual = session.run(None, inputs)[0]
+
+    max_diff = float(np.max(np.abs(actual - expected)))
+    if not max_diff <= CHECK_ATOL:
+        raise ValueError(
+            f"ONNX outputs differ from Keras by up to {max_diff:.2e} "
+            f"(allowed {CHECK_ATOL:.0e}) on {n_samples} samples."
+        )
+    print(f"✅ ONNX outputs match Keras on {n_samples} samples (max diff {max_diff:.2e})")
+
+
+def quantize_onnx(fp32_path=ONNX_FP32_MODEL_PATH, onnx_path=ONNX_MODEL_PATH):
+    """Quantize an FP32 ONNX model's weights to INT8 (activations stay FP32)."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(fp32_path, onnx_path, weight_type=QuantType.QInt8)
+    print(f"✅ INT8 ONNX model saved to {onnx_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export the health risk model to ONNX for serving"
+    )
+    parser.add_argument(
+        "--quantize",
+        action="store_true",
+        help="Serve INT8 dynamic-range quantized weights (FP32 copy is kept)",
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists(KERAS_MODEL_PATH):
+        print(f"❌ Model file '{KERAS_MODEL_PATH}' does not exist.")
+        print("Make sure you have run train.py or run_distributed_fl.py first!")
+        sys.exit(1)
+
+    if args.quantize:
+        export_to_onnx(onnx_path=ONNX_FP32_MODEL_PATH)
+        quantize_onnx()
+    else:
+        export_to_onnx()
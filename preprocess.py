@@ -0,0 +1,189 @@
+"""
+Request Preprocessing
+Turns a raw /predict JSON payload into the 3-part input our model needs.
+"""
+import numpy as np
+
+# --- Global Configuration (shared with train.py) ---
+from train_config import ENV_FEATURES, TEXT_FEATURE, WEARABLE_FEATURES, IMG_SHAPE
+
+REQUIRED_FEATURES = tuple(ENV_FEATURES + WEARABLE_FEATURES + [TEXT_FEATURE])
+NUMERIC_FEATURES = tuple(ENV_FEATURES + WEARABLE_FEATURES)
+
+# Largest value that still fits the model's float32 inputs
+_FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+# --- Fitted preprocessing state (set by init_preprocessing) ---
+_ENV_IDX = tuple(ENV_FEATURES)
+_WEARABLE_IDX = tuple(WEARABLE_FEATURES)
+_ENV_MEAN = None
+_ENV_SCALE = None
+_WEARABLE_MEAN = None
+_WEARABLE_SCALE = None
+TEXT_LUT = {}
+_VALID_DENSITIES = frozenset()
+
+
+def init_preprocessing(env_scaler, wearable_scaler, text_encoder):
+    """
+    Capture what build_model_inputs needs from the fitted preprocessors.
+
+    Models trained with the scalers folded in as Normalization layers take
+    raw feature values; pass None for both scalers to skip scaling. For
+    older models, scaling is applied directly with the scalers' mean_/scale_
+    so a single request does not go through sklearn's input validation, and
+    the column order comes from the fitted scalers so it always matches
+    training. The text branch only ever sees a handful of categories, so
+    each one is encoded once here and looked up per request.
+    """
+    global _ENV_IDX, _WEARABLE_IDX, _ENV_MEAN, _ENV_SCALE
+    global _WEARABLE_MEAN, _WEARABLE_SCALE, TEXT_LUT, _VALID_DENSITIES
+
+    if env_scaler is None or wearable_scaler is None:
+        _ENV_IDX = tuple(ENV_FEATURES)
+        _WEARABLE_IDX = tuple(WEARABLE_FEATURES)
+        _ENV_MEAN = _ENV_SCALE = _WEARABLE_MEAN = _WEARABLE_SCALE = None
+    else:
+        _ENV_IDX = tuple(getattr(env_scaler, "feature_names_in_", ENV_FEATURES))
+        _ENV_MEAN = env_scaler.mean_.astype(np.float32)
+        _ENV_SCALE = env_scaler.scale_.astype(np.float32)
+
+        _WEARABLE_IDX = tuple(
+            getattr(wearable_scaler, "feature_names_in_", WEARABLE_FEATURES)
+        )
+        _WEARABLE_MEAN = wearable_scaler.mean_.astype(np.float32)
+        _WEARABLE_SCALE = wearable_scaler.scale_.astype(np.float32)
+
+    TEXT_LUT = {
+        value: text_encoder.transform([value]).astype(np.float32).reshape(1, 1)
+        for value in text_encoder.classes_.tolist()
+    }
+    _VALID_DENSITIES = frozenset(TEXT_LUT)
+
+
+def _scale(x, mean, scale):
+    """Standard-scale x, unless the model normalizes its inputs (mean is None)."""
+    if mean is None:
+        return x
+    return (x - mean) / scale
+
+
+def _is_finite_number(value):
+    """True for an int or float (not a bool) that is finite in float32."""
+    return (
+        isinstance(value, (int, float))
+        and not isinstance(value, bool)
+        and abs(value) <= _FLOAT32_MAX  # False for NaN and inf
+    )
+
+
+def validate_request(data):
+    """
+    Check a /predict payload before doing any array work.
+
+    Returns an error message, or None if every feature is present, every
+    numeric feature is a finite number and the population density is a
+    known category.
+    """
+    if not isinstance(data, dict):
+        return "Request body must be a JSON object."
+
+    missing = [feature for feature in REQUIRED_FEATURES if feature not in data]
+    if missing:
+        return f"Missing feature in JSON data: {', '.join(map(repr, missing))}"
+
+    invalid = [
+        feature for feature in NUMERIC_FEATURES if not _is_finite_number(data[feature])
+    ]
+    if invalid:
+        return f"Features must be finite numbers: {', '.join(map(repr, invalid))}"
+
+    density = data[TEXT_FEATURE]
+    if not isinstance(density, str) or density not in _VALID_DENSITIES:
+        return (
+            f"Invalid {TEXT_FEATURE}: {density!r}. "
+            f"Expected one of {sorted(_VALID_DENSITIES)}."
+        )
+    return None
+
+
+def build_model_inputs(data):
+    """
+    Build (X_env, X_text, X_image) float32 arrays for one sample.
+
+    Expects a payload that passed validate_request, so every numeric
+    feature is already a finite number.
+    """
+    # 1. Env Data (Branch 1)
+    env_data = np.fromiter(
+        (data[feature] for feature in _ENV_IDX),
+        dtype=np.float32,
+        count=len(_ENV_IDX),
+    ).reshape(1, -1)
+    X_env = _scale(env_data, _ENV_MEAN, _ENV_SCALE)
+
+    # 2. Text Data (Branch 2)
+    X_text = TEXT_LUT[data[TEXT_FEATURE]]
+
+    # 3. Wearable Data (Branch 3)
+    wearable_data = np.fromiter(
+        (data[feature] for feature in _WEARABLE_IDX),
+        dtype=np.float32,
+        count=len(_WEARABLE_IDX),
+    ).reshape(1, -1)
+    X_wearable_scaled = _scale(wearable_data, _WEARABLE_MEAN, _WEARABLE_SCALE)
+    X_image = np.ascontiguousarray(X_wearable_scaled, dtype=np.float32).reshape(
+        (1,) + IMG_SHAPE
+    )
+
+    return X_env, X_text, X_image
+
+
+def validate_batch_request(data, max_instances=None):
+    """
+    Check a /predict_batch payload: {"instances": [<one /predict payload>, ...]}.
+
+    Returns an error message naming the first bad instance, or None. With
+    max_instances set, longer lists are rejected before any instance is checked.
+    """
+    instances = data.get("instances") if isinstance(data, dict) else None
+    if not isinstance(instances, list) or not instances:
+        return 'Request body must be a JSON object with a non-empty "instances" list.'
+    if max_instances is not None and len(instances) > max_instances:
+        return f"Too many instances: {len(instances)}. The limit is {max_instances}."
+
+    for i, instance in enumerate(instances):
+        error = validate_request(instance)
+        if error is not None:
+            return f"Instance {i}: {error}"
+    return None
+
+
+def build_batch_inputs(instances):
+    """
+    Build (X_env, X_text, X_image) float32 arrays with one row per sample.
+
+    Expects a list that passed validate_batch_request, so every numeric
+    feature is already a finite number.
+    """
+    # 1. Env Data (Branch 1)
+    env_data = np.array(
+        [[instance[feature] for feature in _ENV_IDX] for instance in instances],
+        dtype=np.float32,
+    )
+    X_env = _scale(env_data, _ENV_MEAN, _ENV_SCALE)
+
+    # 2. Text Data (Branch 2)
+    X_text = np.concatenate([TEXT_LUT[instance[TEXT_FEATURE]] for instance in instances])
+
+    # 3. Wearable Data (Branch 3)
+    wearable_data = np.array(
+        [[instance[feature] for feature in _WEARABLE_IDX] for instance in instances],
+        dtype=np.float32,
+    )
+    X_wearable_scaled = _scale(wearable_data, _WEARABLE_MEAN, _WEARABLE_SCALE)
+    X_image = np.ascontiguousarray(X_wearable_scaled, dtype=np.float32).reshape(
+        (-1,) + IMG_SHAPE
+    )
+
+    return X_env, X_text, X_image
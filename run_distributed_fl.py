@@ -2,6 +2,7 @@
 Automated Distributed Federated Learning Launcher
 Runs server and all clients automatically with detailed progress tracking.
 """
+import selectors
 import subprocess
 import threading
 import time
@@ -9,17 +10,7 @@ import sys
 import os
 import signal
 from queue import Queue
-from train import (
-    CLIENT_CITIES,
-    build_multi_modal_model,
-    HealthRiskClient,
-    initialize_preprocessors,
-    env_scaler,
-    wearable_scaler,
-    text_encoder,
-    DATA_FILE_PATH,
-)
-import joblib
+from train_config import CLIENT_CITIES, DATA_FILE_PATH
 
 # Configuration
 SERVER_PORT = 9090
@@ -29,6 +20,13 @@ SERVER_ADDRESS = f"localhost:{SERVER_PORT}"
 # Global process list for cleanup
 processes = []
 
+# Pipes waiting to be registered with the output selector loop
+new_pipes = Queue()
+
+# selectors can only watch pipes on POSIX; Windows falls back to one reader
+# thread per pipe
+USE_SELECTOR = os.name != "nt"
+
 
 def print_colored(text, color="white"):
     """Print colored text (simple version, works on most terminals)."""
@@ -45,15 +43,72 @@ def print_colored(text, color="white"):
     print(f"{colors.get(color, '')}{text}{colors['reset']}")
 
 
-def read_output(pipe, queue, label, color):
-    """Read output from a process and put it in a queue with label."""
+def print_line(label, color, line):
+    """Print one line of process output with its label."""
+    line = line.decode('utf-8', errors='ignore').rstrip()
+    if line.strip():
+        print_colored(f"[{label}] {line}", color)
+
+
+def read_output(pipe, label, color):
+    """Print output from one process as it arrives (Windows fallback)."""
     try:
         for line in iter(pipe.readline, b''):
-            if line:
-                queue.put((label, color, line.decode('utf-8', errors='ignore').rstrip()))
+            print_line(label, color, line)
         pipe.close()
     except Exception as e:
-        queue.put((label, color, f"Error reading output: {e}"))
+        print_colored(f"[{label}] Error reading output: {e}", color)
+
+
+def pump_output(stop_event):
+    """Print output from every process from a single selector loop."""
+    sel = selectors.DefaultSelector()
+    partial = {}
+    while True:
+        # Register pipes of processes started since the last pass
+        while not new_pipes.empty():
+            pipe, label, color = new_pipes.get()
+            os.set_blocking(pipe.fileno(), False)
+            sel.register(pipe, selectors.EVENT_READ, data=(label, color))
+            partial[pipe] = b''
+
+        events = sel.select(timeout=0.1)
+        if not events and stop_event.is_set():
+            break
+
+        for key, _ in events:
+            pipe = key.fileobj
+            label, color = key.data
+            try:
+                chunk = os.read(pipe.fileno(), 4096)
+            except BlockingIOError:
+                continue
+            except OSError as e:
+                print_colored(f"[{label}] Error reading output: {e}", color)
+                chunk = b''
+
+            if not chunk:  # EOF: the process exited
+                print_line(label, color, partial.pop(pipe))
+                sel.unregister(pipe)
+                pipe.close()
+                continue
+
+            *lines, partial[pipe] = (partial[pipe] + chunk).split(b'\n')
+            for line in lines:
+                print_line(label, color, line)
+    sel.close()
+
+
+def follow_output(process, label, color):
+    """Start printing a process's output with the given label."""
+    if USE_SELECTOR:
+        new_pipes.put((process.stdout, label, color))
+    else:
+        threading.Thread(
+            target=read_output,
+            args=(process.stdout, label, color),
+            daemon=True
+        ).start()
 
 
 def start_server(port, rounds):
@@ -82,17 +137,6 @@ def start_client(city, server_address):
     return process
 
 
-def display_output(queue, stop_event):
-    """Display output from all processes with labels."""
-    while not stop_event.is_set() or not queue.empty():
-        try:
-            label, color, line = queue.get(timeout=0.1)
-            if line.strip():
-                print_colored(f"[{label}] {line}", color)
-        except:
-            continue
-
-
 def cleanup_processes():
     """Clean up all processes on exit."""
     print_colored("\n\n🛑 Shutting down all processes...", "yellow")
@@ -156,7 +200,6 @@ def main():
     signal.signal(signal.SIGTERM, signal_handler)
     
     # Check if data file exists
-    from train import DATA_FILE_PATH
     if not os.path.exists(DATA_FILE_PATH):
         print_colored(f"❌ ERROR: Data file not found at {DATA_FILE_PATH}", "red")
         print_colored("Please ensure the data file exists before running.", "red")
@@ -171,30 +214,22 @@ def main():
     print_colored("=" * 70, "cyan")
     print()
     
-    # Queue for output from all processes
-    output_queue = Queue()
+    # One thread prints the output of every process
     stop_event = threading.Event()
-    
-    # Start output display thread
-    display_thread = threading.Thread(
-        target=display_output,
-        args=(output_queue, stop_event),
-        daemon=True
-    )
-    display_thread.start()
+    if USE_SELECTOR:
+        display_thread = threading.Thread(
+            target=pump_output,
+            args=(stop_event,),
+            daemon=True
+        )
+        display_thread.start()
     
     # Step 1: Start server
     print_colored("📡 Starting FL Server...", "blue")
     server_process = start_server(SERVER_PORT, NUM_ROUNDS)
     processes.append(server_process)
     
-    # Start reading server output
-    server_thread = threading.Thread(
-        target=read_output,
-        args=(server_process.stdout, output_queue, "SERVER", "blue"),
-        daemon=True
-    )
-    server_thread.start()
+    follow_output(server_process, "SERVER", "blue")
     
     # Wait for server to start
     print_colored("⏳ Waiting for server to initialize (3 seconds)...", "yellow")
@@ -211,12 +246,7 @@ def main():
         
         # Start reading client output
         color = client_colors[i % len(client_colors)]
-        client_thread = threading.Thread(
-            target=read_output,
-            args=(client_process.stdout, output_queue, city.upper(), color),
-            daemon=True
-        )
-        client_thread.start()
+        follow_output(client_process, city.upper(), color)
         
         # Small delay between client starts
         time.sleep(0.5)
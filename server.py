@@ -8,13 +8,9 @@ import sys
 import os
 import joblib
 
-# Import shared configuration and utilities
-import train
-from train import (
-    CLIENT_CITIES,
-    build_multi_modal_model,
-    initialize_preprocessors,
-)
+# Import shared configuration (TensorFlow-free, so --help stays fast;
+# train.py is imported once the server actually starts)
+from train_config import CLIENT_CITIES
 
 def main():
     parser = argparse.ArgumentParser(
@@ -48,6 +44,29 @@ def main():
     print(f"Minimum clients required: {args.min_clients}")
     print(f"Expected clients: {CLIENT_CITIES}")
     print("=" * 60)
+
+    # Fit the preprocessors now, before any rounds run, so saving the final
+    # model does not stall on a full CSV read and refit
+    import train
+    from train import build_multi_modal_model, initialize_preprocessors
+
+    try:
+        initialize_preprocessors()
+    except Exception as e:
+        print(f"\n\nError: Could not fit preprocessors: {e}")
+        sys.exit(1)
+
+    # Get preprocessors from train module after initialization
+    # (they are set as global variables in train.py)
+    env_scaler = train.env_scaler
+    wearable_scaler = train.wearable_scaler
+    text_encoder = train.text_encoder
+
+    # Verify preprocessors are initialized
+    if env_scaler is None or wearable_scaler is None or text_encoder is None:
+        print("\n\nError: Preprocessors were not initialized properly")
+        sys.exit(1)
+
     print("\nWaiting for clients to connect...\n")
 
     # Custom strategy that saves model after final round
@@ -68,19 +87,6 @@ def main():
                 print(" Saving aggregated model...")
                 print("=" * 60)
                 try:
-                    # Initialize preprocessors
-                    initialize_preprocessors()
-                    
-                    # Get preprocessors from train module after initialization
-                    # (they are set as global variables in train.py)
-                    env_scaler = train.env_scaler
-                    wearable_scaler = train.wearable_scaler
-                    text_encoder = train.text_encoder
-                    
-                    # Verify preprocessors are initialized
-                    if env_scaler is None or wearable_scaler is None or text_encoder is None:
-                        raise ValueError("Preprocessors were not initialized properly")
-                    
                     # Build model and set aggregated weights
                     model = build_multi_modal_model()
                     model.set_weights(parameters_ndarrays)
@@ -1,10 +1,22 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-import json
+from requests.adapters import HTTPAdapter
 
 print("--- Testing our Flask API ---")
 
 # This is the URL where our app.py server is running
 url = "http://127.0.0.1:5000/predict"
+batch_url = "http://127.0.0.1:5000/predict_batch"
+
+# Load test settings: samples per batched request, and concurrent requests
+BATCH_SIZE = 32
+CONCURRENT_REQUESTS = 32
+
+# One pooled session reuses its TCP connections across every request below
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=CONCURRENT_REQUESTS))
 
 
 # --- Create some example data for one prediction ---
@@ -34,7 +46,7 @@ test_data = {
 # --- Send the POST request ---
 try:
     # We send our test_data as a JSON payload
-    response = requests.post(url, json=test_data)
+    response = session.post(url, json=test_data)
 
     # Check if the server responded successfully (Status Code 200)
     if response.status_code == 200:
@@ -45,6 +57,31 @@ try:
         print("Response:")
         print(response.text)
 
+    # --- Send many samples in one batched request ---
+    response = session.post(batch_url, json={"instances": [test_data] * BATCH_SIZE})
+    if response.status_code == 200:
+        predictions = response.json()["predicted_hospital_admissions"]
+        print(f"\n✅ Batch of {len(predictions)} predictions: {predictions[:3]} ...")
+    else:
+        print(f"\n❌ Batch error: Server returned status code {response.status_code}")
+        print(response.text)
+
+    # --- Fire concurrent single requests (the server batches them) ---
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENT_REQUESTS) as pool:
+        responses = list(
+            pool.map(
+                lambda _: session.post(url, json=test_data),
+                range(CONCURRENT_REQUESTS),
+            )
+        )
+    elapsed = time.perf_counter() - start
+    ok = sum(r.status_code == 200 for r in responses)
+    print(
+        f"\n✅ {ok}/{CONCURRENT_REQUESTS} concurrent requests succeeded "
+        f"in {elapsed * 1000:.1f} ms"
+    )
+
 except requests.exceptions.ConnectionError:
     print("\n❌ FAILED. Could not connect to the server.")
     print(f"Make sure your 'app.py' server is running in the other terminal!")
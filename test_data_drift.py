@@ -0,0 +1,44 @@
+# test_data_drift.py
+"""
+Regression tests for the drift detection statistics.
+Checks that the presorted KS test in data_drift.py gives the same statistic
+and p-value as scipy.stats.ks_2samp, on both sides of the exact/asymptotic
+p-value switch. Run with pytest, or directly: python test_data_drift.py
+"""
+import numpy as np
+from scipy.stats import ks_2samp
+
+from data_drift import KS_EXACT_MAX_N, _ks_presorted
+
+# (reference size, new size, shift of the new sample's mean)
+KS_CASES = [
+    (50, 40, 0.0),
+    (50, 40, 0.5),
+    (1000, 250, 0.1),
+    (KS_EXACT_MAX_N, 2000, 0.05),
+    (KS_EXACT_MAX_N + 1, 2000, 0.05),
+    (40000, 10000, 0.02),
+]
+
+
+def test_ks_presorted_matches_ks_2samp():
+    """_ks_presorted must agree with ks_2samp for raw reference samples."""
+    rng = np.random.default_rng(42)
+    for n_ref, n_new, shift in KS_CASES:
+        reference = rng.standard_normal(n_ref).astype(np.float32)
+        new = (rng.standard_normal(n_new) + shift).astype(np.float32)
+
+        statistic, p_value = _ks_presorted(np.sort(reference), new)
+        expected = ks_2samp(reference, new)
+
+        assert np.isclose(statistic, expected.statistic, rtol=0, atol=1e-12), (
+            n_ref, n_new, statistic, expected.statistic
+        )
+        assert np.isclose(p_value, expected.pvalue, rtol=1e-9, atol=1e-12), (
+            n_ref, n_new, p_value, expected.pvalue
+        )
+        print(f"✅ {n_ref} vs {n_new}: D={statistic:.4f}, p={p_value:.4f}")
+
+
+if __name__ == "__main__":
+    test_ks_presorted_matches_ks_2samp()
@@ -7,9 +7,9 @@ Includes MLflow tracking for evaluation runs.
 import os
 import numpy as np
 import pandas as pd
+import tensorflow as tf
 from tensorflow import keras
 import joblib
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 import requests
 import json
 import mlflow
@@ -28,6 +28,10 @@ from train import (
     initialize_preprocessors,
 )
 
+# Samples per forward pass when evaluating on the test data
+EVAL_BATCH_SIZE = 4096
+
+
 def test_model_loading():
     """Test if model and preprocessors can be loaded."""
     print("=" * 60)
@@ -41,7 +45,10 @@ def test_model_loading():
         if not os.path.exists("model/health_model.keras"):
             errors.append("Model file 'model/health_model.keras' does not exist")
         else:
-            model = keras.models.load_model("model/health_model.keras")
+            # Inference only, so skip rebuilding the optimizer and metrics
+            model = keras.models.load_model(
+                "model/health_model.keras", compile=False
+            )
             print("✅ Model loaded successfully")
             print(f"   Model summary: {len(model.get_weights())} weight arrays")
     except Exception as e:
@@ -76,8 +83,30 @@ def test_model_loading():
         return model, preprocessors
 
 
-def evaluate_model_on_test_data(model):
-    """Evaluate the model on test data from all cities."""
+def _grouped_regression_metrics(y_true, y_pred, group_ids):
+    """
+    MSE, MAE and R² for each group of samples, plus the group sizes.
+    Every metric is a np.bincount reduction over all samples at once.
+    """
+    y_true = y_true.astype(np.float64)
+    errors = y_pred.astype(np.float64) - y_true
+    counts = np.bincount(group_ids)
+    mse = np.bincount(group_ids, errors ** 2) / counts
+    mae = np.bincount(group_ids, np.abs(errors)) / counts
+    group_mean = np.bincount(group_ids, y_true) / counts
+    ss_tot = np.bincount(group_ids, (y_true - group_mean[group_ids]) ** 2)
+    r2 = 1 - mse * counts / ss_tot
+    return mse, mae, r2, counts
+
+
+def evaluate_model_on_test_data(model, preprocessors=None):
+    """
+    Evaluate the model on test data from all cities.
+
+    Models saved before the scalers were folded into the model take
+    standard-scaled env and wearable inputs; those are scaled with the saved
+    scalers in preprocessors.
+    """
     print("=" * 60)
     print("2. Evaluating Model on Test Data")
     print("=" * 60)
@@ -85,61 +114,108 @@ def evaluate_model_on_test_data(model):
     # Initialize preprocessors (needed for data loading)
     initialize_preprocessors()
     
-    all_predictions = []
-    all_actuals = []
-    city_results = {}
-    
+    load_errors = {}
+    test_sets = {}
     for city in CLIENT_CITIES:
         try:
-            print(f"\nEvaluating on {city} test data...")
-            
             # Load test data for this city
-            _, (X_test, y_test) = load_and_preprocess_data_for_client(city)
-            
-            # Make predictions
-            predictions = model.predict(X_test, verbose=0)
-            predictions = predictions.flatten()
-            
-            # Calculate metrics
-            mse = mean_squared_error(y_test, predictions)
-            mae = mean_absolute_error(y_test, predictions)
-            rmse = np.sqrt(mse)
-            r2 = r2_score(y_test, predictions)
-            
-            # Store results
-            city_results[city] = {
-                "mse": mse,
-                "mae": mae,
-                "rmse": rmse,
-                "r2": r2,
-                "samples": len(y_test),
-            }
-            
-            # Collect for overall metrics
-            all_predictions.extend(predictions)
-            all_actuals.extend(y_test)
-            
-            print(f"   Samples: {len(y_test)}")
-            print(f"   MSE: {mse:.4f}")
-            print(f"   MAE: {mae:.4f}")
-            print(f"   RMSE: {rmse:.4f}")
-            print(f"   R²: {r2:.4f}")
-            
+            _, _, test_sets[city] = load_and_preprocess_data_for_client(city)
         except Exception as e:
-            print(f"   ❌ Error evaluating {city}: {e}")
-            city_results[city] = {"error": str(e)}
+            load_errors[city] = e
+    
+    # Make predictions for every city in one pass over a single pipeline;
+    # model.predict would rebuild its data pipeline for each city.
+    cities = list(test_sets)
+    X_all = [
+        np.concatenate([test_sets[city][0][k] for city in cities]) for k in range(3)
+    ]
+    y_all = np.concatenate([test_sets[city][1] for city in cities])
+    offsets = np.cumsum([0] + [len(test_sets[city][1]) for city in cities])
+    
+    # The test arrays hold raw features. As in app.py's
+    # MODEL_NORMALIZES_INPUTS check, a model without the folded-in
+    # Normalization layer needs them scaled first.
+    if not any(layer.name == "env_normalization" for layer in model.layers):
+        if not preprocessors:
+            raise ValueError(
+                "Model has no normalization layers and no saved scalers were "
+                "given. Retrain it with train.py or train_simple.py."
+            )
+        print("   Model expects scaled inputs, applying the saved scalers.")
+        env_scaler = preprocessors["env_scaler"]
+        wearable_scaler = preprocessors["wearable_scaler"]
+        X_all[0] = ((X_all[0] - env_scaler.mean_) / env_scaler.scale_).astype(
+            np.float32
+        )
+        X_all[2] = (
+            (X_all[2].reshape(len(y_all), -1) - wearable_scaler.mean_)
+            / wearable_scaler.scale_
+        ).astype(np.float32).reshape(X_all[2].shape)
+    
+    # XLA compiles the whole forward pass into a few fused kernels
+    predict_fn = tf.function(
+        lambda e, t, i: model([e, t, i], training=False),
+        jit_compile=True,
+        reduce_retracing=True,
+    )
+    # Batches are prefetched so slicing the next one overlaps the current
+    # forward pass, and each batch's predictions land in a preallocated array
+    dataset = (
+        tf.data.Dataset.from_tensor_slices(tuple(X_all))
+        .batch(EVAL_BATCH_SIZE)
+        .prefetch(tf.data.AUTOTUNE)
+    )
+    all_predictions = np.empty(len(y_all), dtype=np.float32)
+    start = 0
+    for X_env, X_text, X_image in dataset:
+        batch_predictions = predict_fn(X_env, X_text, X_image).numpy().ravel()
+        all_predictions[start:start + len(batch_predictions)] = batch_predictions
+        start += len(batch_predictions)
+    
+    # Calculate metrics for every city in one pass
+    city_ids = np.repeat(np.arange(len(cities)), np.diff(offsets))
+    city_mse, city_mae, city_r2, city_samples = _grouped_regression_metrics(
+        y_all, all_predictions, city_ids
+    )
+    
+    city_results = {}
+    for city in CLIENT_CITIES:
+        print(f"\nEvaluating on {city} test data...")
+        if city in load_errors:
+            print(f"   ❌ Error evaluating {city}: {load_errors[city]}")
+            city_results[city] = {"error": str(load_errors[city])}
+            continue
+        
+        i = cities.index(city)
+        mse, mae, r2 = city_mse[i], city_mae[i], city_r2[i]
+        rmse = np.sqrt(mse)
+        
+        # Store results
+        city_results[city] = {
+            "mse": mse,
+            "mae": mae,
+            "rmse": rmse,
+            "r2": r2,
+            "samples": int(city_samples[i]),
+        }
+        
+        print(f"   Samples: {city_samples[i]}")
+        print(f"   MSE: {mse:.4f}")
+        print(f"   MAE: {mae:.4f}")
+        print(f"   RMSE: {rmse:.4f}")
+        print(f"   R²: {r2:.4f}")
     
     # Calculate overall metrics
     print("\n" + "-" * 60)
     print("Overall Performance (All Cities Combined):")
     print("-" * 60)
     
-    overall_mse = mean_squared_error(all_actuals, all_predictions)
-    overall_mae = mean_absolute_error(all_actuals, all_predictions)
+    (overall_mse,), (overall_mae,), (overall_r2,), _ = _grouped_regression_metrics(
+        y_all, all_predictions, np.zeros(len(y_all), dtype=np.intp)
+    )
     overall_rmse = np.sqrt(overall_mse)
-    overall_r2 = r2_score(all_actuals, all_predictions)
     
-    print(f"Total Test Samples: {len(all_actuals)}")
+    print(f"Total Test Samples: {len(y_all)}")
     print(f"MSE: {overall_mse:.4f}")
     print(f"MAE: {overall_mae:.4f}")
     print(f"RMSE: {overall_rmse:.4f}")
@@ -150,7 +226,7 @@ def evaluate_model_on_test_data(model):
         "mae": overall_mae,
         "rmse": overall_rmse,
         "r2": overall_r2,
-        "samples": len(all_actuals),
+        "samples": len(y_all),
     }
 
 
@@ -266,7 +342,9 @@ def main():
         mlflow.log_param("model_file", "model/health_model.keras")
         
         # Test 2: Model evaluation
-        city_results, overall_results = evaluate_model_on_test_data(model)
+        city_results, overall_results = evaluate_model_on_test_data(
+            model, preprocessors
+        )
         
         # Log overall metrics to MLflow
         mlflow.log_metric("overall_mse", overall_results["mse"])
@@ -9,38 +9,50 @@ import joblib
 import os
 import flwr as fl
 
-# --- 1. Define Global Configuration (from our EDA) ---
-ENV_FEATURES = [
-    "aqi",
-    "pm2_5",
-    "pm10",
-    "no2",
-    "o3",
-    "temperature",
-    "humidity",
-    "hospital_capacity",
-    "occupancy_ratio",
-]
-TEXT_FEATURE = "population_density"
-POPULATION_CLASSES = ["Rural", "Urban", "Suburban"]
-WEARABLE_FEATURES = [
-    "heart_rate",
-    "oxygen_saturation",
-    "steps",
-    "sleep_hours",
-    "respiratory_rate",
-    "body_temp",
-]
-TARGET = "hospital_admissions"
-IMG_SHAPE = (2, 3, 1)
-DATA_FILE_PATH = "data/MLOPs_data.csv"
-CLIENT_CITIES = ["Delhi", "Beijing", "Mexico City", "Los Angeles"]
+# --- 1. Global Configuration (from our EDA, lives in train_config.py) ---
+from train_config import (
+    ENV_FEATURES,
+    TEXT_FEATURE,
+    POPULATION_CLASSES,
+    WEARABLE_FEATURES,
+    TARGET,
+    IMG_SHAPE,
+    DATA_FILE_PATH,
+    CLIENT_CITIES,
+)
+
+# Optional Keras mixed precision policy, e.g. "mixed_bfloat16"; unset
+# trains in float32, which is faster on CPUs without native bfloat16
+MIXED_PRECISION_POLICY = os.environ.get("MIXED_PRECISION_POLICY")
 
 
 # --- 2. Define the Model Building Function (copied from our notebook) ---
-def build_multi_modal_model():
+def build_multi_modal_model(scalers=None):
+    """
+    Build and compile the 3-branch model.
+
+    The fitted (env_scaler, wearable_scaler) are folded into the model as
+    Normalization layers, so it takes raw feature values. They default to
+    the scalers fitted by initialize_preprocessors().
+    """
+    if scalers is None:
+        initialize_preprocessors()
+        scalers = (env_scaler, wearable_scaler)
+    fitted_env_scaler, fitted_wearable_scaler = scalers
+
+    if MIXED_PRECISION_POLICY:
+        keras.mixed_precision.set_global_policy(MIXED_PRECISION_POLICY)
+
+    # The Normalization layers stay in float32: raw values such as
+    # hospital_capacity lose too much precision in bfloat16
     input_env = layers.Input(shape=(len(ENV_FEATURES),), name="env_input")
-    x_env = layers.Dense(32, activation="relu")(input_env)
+    x_env = layers.Normalization(
+        mean=fitted_env_scaler.mean_,
+        variance=fitted_env_scaler.scale_**2,
+        dtype="float32",
+        name="env_normalization",
+    )(input_env)
+    x_env = layers.Dense(32, activation="relu")(x_env)
     x_env = layers.Dropout(0.3)(x_env)
     x_env_out = layers.Dense(16, activation="relu")(x_env)
 
@@ -52,7 +64,14 @@ def build_multi_modal_model():
     x_text_out = layers.Dense(4, activation="relu")(x_text)
 
     input_image = layers.Input(shape=IMG_SHAPE, name="wearable_image_input")
-    x_img = layers.Conv2D(8, (2, 2), activation="relu", padding="same")(input_image)
+    x_img = layers.Normalization(
+        axis=(1, 2),
+        mean=fitted_wearable_scaler.mean_.reshape(IMG_SHAPE[:2]),
+        variance=(fitted_wearable_scaler.scale_**2).reshape(IMG_SHAPE[:2]),
+        dtype="float32",
+        name="wearable_normalization",
+    )(input_image)
+    x_img = layers.Conv2D(8, (2, 2), activation="relu", padding="same")(x_img)
     x_img = layers.MaxPooling2D((1, 1))(x_img)
     x_img = layers.Flatten()(x_img)
     x_img_out = layers.Dense(8, activation="relu")(x_img)
@@ -61,22 +80,38 @@ def build_multi_modal_model():
 
     x = layers.Dense(32, activation="relu")(concatenated)
     x = layers.Dropout(0.5)(x)
-    output_layer = layers.Dense(1, activation="linear", name="output")(x)
+    # Keep the regression output in float32 under mixed precision
+    output_layer = layers.Dense(1, activation="linear", name="output", dtype="float32")(x)
 
     model = keras.Model(
         inputs=[input_env, input_text, input_image],
         outputs=output_layer,
         name="3_branch_health_model",
     )
-    model.compile(loss="mse", optimizer="adam", metrics=["mae"])
+    # XLA fuses the three small branches into a few kernels
+    model.compile(loss="mse", optimizer="adam", metrics=["mae"], jit_compile=True)
     return model
 
 
+# Columns read from the CSV and the dtypes of its numeric features
+USED_COLUMNS = ENV_FEATURES + WEARABLE_FEATURES + [TEXT_FEATURE, TARGET, "city"]
+NUMERIC_DTYPES = {feature: np.float32 for feature in ENV_FEATURES + WEARABLE_FEATURES}
+
+
 # --- 3. Global preprocessors (will be initialized when needed) ---
 env_scaler = None
 wearable_scaler = None
 text_encoder = None
 
+# Each client city's model inputs and target as contiguous arrays ("env",
+# "text", "wear_img", "y"), built once by initialize_preprocessors. The env and
+# wearable features stay unscaled; the model normalizes them itself.
+_CITY_ARRAYS = {}
+
+# Preprocessed (train, validation, test) (X, y) splits per city, so Flower
+# rounds after the first reuse them instead of re-reading and re-scaling
+_CLIENT_CACHE = {}
+
 
 def initialize_preprocessors():
     """Initialize and fit preprocessors on all data."""
@@ -86,7 +121,15 @@ def initialize_preprocessors():
         return  # Already initialized
 
     print("Fitting preprocessors on all data...")
-    df = pd.read_csv(DATA_FILE_PATH, encoding="latin1")
+    # Only parse the columns we use, with the numeric features read straight
+    # into float32 by pyarrow's multithreaded reader
+    df = pd.read_csv(
+        DATA_FILE_PATH,
+        encoding="latin1",
+        usecols=USED_COLUMNS,
+        dtype=NUMERIC_DTYPES,
+        engine="pyarrow",
+    )
 
     # Fit preprocessors on full dataset (needed for consistent scaling across clients)
     env_scaler = StandardScaler()
@@ -97,6 +140,34 @@ def initialize_preprocessors():
 
     text_encoder = LabelEncoder()
     text_encoder.fit(POPULATION_CLASSES)
+    # Encode the handful of categories with a dict lookup; the encoder is
+    # still saved for the API, and its (sorted) classes_ define the codes
+    text_codes = {value: code for code, value in enumerate(text_encoder.classes_)}
+    text_values = df[TEXT_FEATURE].map(text_codes)
+    if text_values.isna().any():
+        unseen = df.loc[text_values.isna(), TEXT_FEATURE].unique()
+        raise ValueError(f"Unknown {TEXT_FEATURE} values: {sorted(unseen)}")
+
+    # Build the whole dataset's model inputs once, in the float32 the model
+    # computes in, then take each client city's rows by integer index instead
+    # of copying a filtered DataFrame per city. Other cities in the CSV only
+    # feed the scalers, so their rows are never copied out.
+    all_arrays = {
+        "env": df[ENV_FEATURES].to_numpy(np.float32),
+        "text": text_values.to_numpy(np.int32),
+        "wear_img": df[WEARABLE_FEATURES].to_numpy(np.float32).reshape(
+            (-1,) + IMG_SHAPE
+        ),
+        "y": df[TARGET].to_numpy(np.float32),
+    }
+    city_values = df["city"].to_numpy()
+    for city in CLIENT_CITIES:
+        city_rows = np.flatnonzero(city_values == city)
+        if len(city_rows) == 0:
+            continue
+        _CITY_ARRAYS[city] = {
+            name: array[city_rows] for name, array in all_arrays.items()
+        }
 
     print("Preprocessors fitted successfully.")
 
@@ -104,36 +175,37 @@ def initialize_preprocessors():
 # --- 4. Define Data Loading Function for Each Client ---
 def load_and_preprocess_data_for_client(client_city: str):
     """
-    Loads the main dataset, filters for a specific city, and preprocesses
-    it into the 3-input format for our multi-modal model.
+    Returns a specific city's data in the 3-input format for our
+    multi-modal model, split into train/validation/test sets:
+    ((X_train, y_train), (X_val, y_val), (X_test, y_test)).
     """
-    # Ensure preprocessors are initialized
-    initialize_preprocessors()
+    if client_city in _CLIENT_CACHE:
+        return _CLIENT_CACHE[client_city]
 
-    df = pd.read_csv(DATA_FILE_PATH, encoding="latin1")
-    client_df = df[df["city"] == client_city].copy()
+    # Ensure preprocessors are initialized (this also preprocesses every city)
+    initialize_preprocessors()
 
-    if len(client_df) == 0:
+    city_arrays = _CITY_ARRAYS.get(client_city)
+    if city_arrays is None:
         raise ValueError(f"No data found for city: {client_city}")
 
-    # 1. Preprocess Branch 1: Environmental Data
-    X_env = env_scaler.transform(client_df[ENV_FEATURES])
+    # 1-3. Inputs for the Env, Text and Wearable/Image branches
+    X_env = city_arrays["env"]
+    X_text = city_arrays["text"]
+    X_image = city_arrays["wear_img"]
 
-    # 2. Preprocess Branch 2: Text Data
-    X_text = text_encoder.transform(client_df[TEXT_FEATURE])
+    # 4. The Target (Y)
+    y = city_arrays["y"]
 
-    # 3. Preprocess Branch 3: Wearable/Image Data
-    X_wearable_scaled = wearable_scaler.transform(client_df[WEARABLE_FEATURES])
-    X_image = X_wearable_scaled.reshape((-1, IMG_SHAPE[0], IMG_SHAPE[1], IMG_SHAPE[2]))
-
-    # 4. Prepare the Target (Y)
-    y = client_df[TARGET].values
-
-    # 5. Split into Train/Test for this client
+    # 5. Split into Train/Test for this client, then hold out 10% of the
+    # training rows for validation once instead of on every fit() call
     indices = np.arange(len(y))
     train_indices, test_indices = train_test_split(
         indices, test_size=0.2, random_state=42
     )
+    train_indices, val_indices = train_test_split(
+        train_indices, test_size=0.1, random_state=42
+    )
 
     X_train = [
         X_env[train_indices],
@@ -142,6 +214,13 @@ def load_and_preprocess_data_for_client(client_city: str):
     ]
     y_train = y[train_indices]
 
+    X_val = [
+        X_env[val_indices],
+        X_text[val_indices],
+        X_image[val_indices],
+    ]
+    y_val = y[val_indices]
+
     X_test = [
         X_env[test_indices],
         X_text[test_indices],
@@ -149,7 +228,8 @@ def load_and_preprocess_data_for_client(client_city: str):
     ]
     y_test = y[test_indices]
 
-    return (X_train, y_train), (X_test, y_test)
+    _CLIENT_CACHE[client_city] = (X_train, y_train), (X_val, y_val), (X_test, y_test)
+    return _CLIENT_CACHE[client_city]
 
 
 # --- 5. Define Flower Client ---
@@ -159,33 +239,51 @@ class HealthRiskClient(fl.client.NumPyClient):
     Each client (city) will be an instance of this class.
     """
 
-    def __init__(self, client_city):
+    def __init__(self, client_city, data_ref=None, scalers=None):
         self.client_city = client_city
+        # Ray object ref to this city's preprocessed data, if the driver
+        # published it (simulation mode)
+        self.data_ref = data_ref
+        # Fitted (env_scaler, wearable_scaler) the model folds in; fitted
+        # locally when not passed in
+        self.scalers = scalers
         self.model = None
         self.X_train = None
         self.y_train = None
+        self.X_val = None
+        self.y_val = None
         self.X_test = None
         self.y_test = None
         print(f"Client for {client_city} created.")
 
+    def _load_data(self):
+        """Attach to the data published by the driver, else build it locally."""
+        if self.data_ref is not None:
+            import ray
+
+            return ray.get(self.data_ref)
+        return load_and_preprocess_data_for_client(self.client_city)
+
     def get_parameters(self, config):
         if self.model is None:
-            self.model = build_multi_modal_model()
+            self.model = build_multi_modal_model(self.scalers)
         print(f"\n[Client {self.client_city}] Sending parameters to server.")
         return self.model.get_weights()
 
     def fit(self, parameters, config):
         if self.X_train is None:
             print(f"[Client {self.client_city}] Loading local data...")
-            (self.X_train, self.y_train), (self.X_test, self.y_test) = (
-                load_and_preprocess_data_for_client(self.client_city)
-            )
+            (
+                (self.X_train, self.y_train),
+                (self.X_val, self.y_val),
+                (self.X_test, self.y_test),
+            ) = self._load_data()
             print(
                 f"[Client {self.client_city}] Data loaded. {len(self.y_train)} train samples."
             )
 
         if self.model is None:
-            self.model = build_multi_modal_model()
+            self.model = build_multi_modal_model(self.scalers)
 
         self.model.set_weights(parameters)
 
@@ -195,7 +293,7 @@ class HealthRiskClient(fl.client.NumPyClient):
             self.y_train,
             epochs=1,
             batch_size=32,
-            validation_split=0.1,
+            validation_data=(self.X_val, self.y_val),
             verbose=0,  # Set to 0 for cleaner output
         )
 
@@ -206,12 +304,10 @@ class HealthRiskClient(fl.client.NumPyClient):
         print(f"[Client {self.client_city}] Evaluating model on local test set...")
 
         if self.X_test is None:
-            _, (self.X_test, self.y_test) = load_and_preprocess_data_for_client(
-                self.client_city
-            )
+            _, _, (self.X_test, self.y_test) = self._load_data()
 
         if self.model is None:
-            self.model = build_multi_modal_model()
+            self.model = build_multi_modal_model(self.scalers)
         self.model.set_weights(parameters)
 
         loss, mae = self.model.evaluate(self.X_test, self.y_test, verbose=0)
@@ -233,6 +329,26 @@ if __name__ == "__main__":
     # Initialize preprocessors
     initialize_preprocessors()
 
+    # Publish every city's preprocessed data to Ray's shared object store
+    # once, and hand the fitted scalers to each client; simulated clients
+    # then never re-read the CSV or re-fit the preprocessors in a worker
+    import ray
+
+    ray.init(ignore_reinit_error=True, include_dashboard=False)
+    data_refs = {
+        city: ray.put(load_and_preprocess_data_for_client(city))
+        for city in CLIENT_CITIES
+    }
+
+    def simulation_client_fn(cid: str) -> HealthRiskClient:
+        """Create a client that reads its city's data from the object store."""
+        city_name = CLIENT_CITIES[int(cid)]
+        return HealthRiskClient(
+            client_city=city_name,
+            data_ref=data_refs[city_name],
+            scalers=(env_scaler, wearable_scaler),
+        )
+
     # --- Run Federated Learning Simulation ---
     print("\n--- Starting Federated Learning Simulation ---")
 
@@ -247,11 +363,12 @@ if __name__ == "__main__":
 
     # Start the Simulation
     history = fl.simulation.start_simulation(
-        client_fn=client_fn,
+        client_fn=simulation_client_fn,
         num_clients=len(CLIENT_CITIES),
         config=fl.server.ServerConfig(num_rounds=3),  # Run for 3 rounds
         strategy=strategy,
         client_resources={"num_cpus": 1, "num_gpus": 0},  # Basic resources
+        keep_initialised=True,  # Reuse the Ray instance holding data_refs
     )
 
     print("--- Federated Learning Simulation Finished! ---")
@@ -300,7 +417,7 @@ if __name__ == "__main__":
         print("Evaluating final aggregated model...")
         # Create test data from one client for evaluation
         temp_client = client_fn("0")
-        _, (X_test, y_test) = temp_client.X_test, temp_client.y_test if hasattr(temp_client, 'X_test') else load_and_preprocess_data_for_client(CLIENT_CITIES[0])[1]
+        _, (X_test, y_test) = temp_client.X_test, temp_client.y_test if hasattr(temp_client, 'X_test') else load_and_preprocess_data_for_client(CLIENT_CITIES[0])[2]
         
         if X_test is not None and y_test is not None:
             test_loss, test_mae = final_model.evaluate(X_test, y_test, verbose=0)
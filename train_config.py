@@ -0,0 +1,31 @@
+"""
+Shared Configuration
+Feature lists and paths used by training, serving and drift detection.
+Kept free of TensorFlow so scripts that only need the config start quickly.
+"""
+
+ENV_FEATURES = [
+    "aqi",
+    "pm2_5",
+    "pm10",
+    "no2",
+    "o3",
+    "temperature",
+    "humidity",
+    "hospital_capacity",
+    "occupancy_ratio",
+]
+TEXT_FEATURE = "population_density"
+POPULATION_CLASSES = ["Rural", "Urban", "Suburban"]
+WEARABLE_FEATURES = [
+    "heart_rate",
+    "oxygen_saturation",
+    "steps",
+    "sleep_hours",
+    "respiratory_rate",
+    "body_temp",
+]
+TARGET = "hospital_admissions"
+IMG_SHAPE = (2, 3, 1)
+DATA_FILE_PATH = "data/MLOPs_data.csv"
+CLIENT_CITIES = ["Delhi", "Beijing", "Mexico City", "Los Angeles"]
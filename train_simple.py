@@ -42,12 +42,30 @@ WEARABLE_FEATURES = [
 TARGET = "hospital_admissions"
 IMG_SHAPE = (2, 3, 1)
 DATA_FILE_PATH = "data/MLOPs_data.csv"
+# Optional Keras mixed precision policy, e.g. "mixed_bfloat16"; unset
+# trains in float32, which is faster on CPUs without native bfloat16
+MIXED_PRECISION_POLICY = os.environ.get("MIXED_PRECISION_POLICY")
 
 
 # --- 2. Define the Model Building Function ---
-def build_multi_modal_model():
+def build_multi_modal_model(env_scaler, wearable_scaler):
+    """
+    Build and compile the 3-branch model. The fitted scalers are folded
+    into it as Normalization layers, so it takes raw feature values.
+    """
+    if MIXED_PRECISION_POLICY:
+        keras.mixed_precision.set_global_policy(MIXED_PRECISION_POLICY)
+
+    # The Normalization layers stay in float32: raw values such as
+    # hospital_capacity lose too much precision in bfloat16
     input_env = layers.Input(shape=(len(ENV_FEATURES),), name="env_input")
-    x_env = layers.Dense(32, activation="relu")(input_env)
+    x_env = layers.Normalization(
+        mean=env_scaler.mean_,
+        variance=env_scaler.scale_**2,
+        dtype="float32",
+        name="env_normalization",
+    )(input_env)
+    x_env = layers.Dense(32, activation="relu")(x_env)
     x_env = layers.Dropout(0.3)(x_env)
     x_env_out = layers.Dense(16, activation="relu")(x_env)
 
@@ -59,7 +77,14 @@ def build_multi_modal_model():
     x_text_out = layers.Dense(4, activation="relu")(x_text)
 
     input_image = layers.Input(shape=IMG_SHAPE, name="wearable_image_input")
-    x_img = layers.Conv2D(8, (2, 2), activation="relu", padding="same")(input_image)
+    x_img = layers.Normalization(
+        axis=(1, 2),
+        mean=wearable_scaler.mean_.reshape(IMG_SHAPE[:2]),
+        variance=(wearable_scaler.scale_**2).reshape(IMG_SHAPE[:2]),
+        dtype="float32",
+        name="wearable_normalization",
+    )(input_image)
+    x_img = layers.Conv2D(8, (2, 2), activation="relu", padding="same")(x_img)
     x_img = layers.MaxPooling2D((1, 1))(x_img)
     x_img = layers.Flatten()(x_img)
     x_img_out = layers.Dense(8, activation="relu")(x_img)
@@ -68,14 +93,16 @@ def build_multi_modal_model():
 
     x = layers.Dense(32, activation="relu")(concatenated)
     x = layers.Dropout(0.5)(x)
-    output_layer = layers.Dense(1, activation="linear", name="output")(x)
+    # Keep the regression output in float32 under mixed precision
+    output_layer = layers.Dense(1, activation="linear", name="output", dtype="float32")(x)
 
     model = keras.Model(
         inputs=[input_env, input_text, input_image],
         outputs=output_layer,
         name="3_branch_health_model",
     )
-    model.compile(loss="mse", optimizer="adam", metrics=["mae"])
+    # XLA fuses the three small branches into a few kernels
+    model.compile(loss="mse", optimizer="adam", metrics=["mae"], jit_compile=True)
     return model
 
 
@@ -90,7 +117,14 @@ def main():
     if not os.path.exists(DATA_FILE_PATH):
         raise FileNotFoundError(f"Data file not found: {DATA_FILE_PATH}")
     
-    df = pd.read_csv(DATA_FILE_PATH, encoding="latin1")
+    # Only parse the columns we use, numeric features straight into float32
+    df = pd.read_csv(
+        DATA_FILE_PATH,
+        encoding="latin1",
+        usecols=ENV_FEATURES + WEARABLE_FEATURES + [TEXT_FEATURE, TARGET],
+        dtype={feature: np.float32 for feature in ENV_FEATURES + WEARABLE_FEATURES},
+        engine="pyarrow",
+    )
     print(f"   ✅ Loaded {len(df)} rows")
     
     # Initialize and fit preprocessors
@@ -103,16 +137,25 @@ def main():
     
     text_encoder = LabelEncoder()
     text_encoder.fit(POPULATION_CLASSES)
+    # The encoder's (sorted) classes_ define the codes; a dict lookup is
+    # all it takes to apply them to a handful of categories
+    text_codes = {value: code for code, value in enumerate(text_encoder.classes_)}
     print("   ✅ Preprocessors fitted")
     
     # Preprocess data
     print("\n3. Preprocessing data...")
-    X_env = env_scaler.transform(df[ENV_FEATURES])
-    X_text = text_encoder.transform(df[TEXT_FEATURE])
-    X_wearable_scaled = wearable_scaler.transform(df[WEARABLE_FEATURES])
-    X_image = X_wearable_scaled.reshape((-1, IMG_SHAPE[0], IMG_SHAPE[1], IMG_SHAPE[2]))
+    # float32 throughout, matching the model's dtype, so fit() does not cast.
+    # Env and wearable features stay unscaled; the model normalizes them.
+    X_env = df[ENV_FEATURES].to_numpy(np.float32)
+    text_values = df[TEXT_FEATURE].map(text_codes)
+    if text_values.isna().any():
+        unseen = df.loc[text_values.isna(), TEXT_FEATURE].unique()
+        raise ValueError(f"Unknown {TEXT_FEATURE} values: {sorted(unseen)}")
+    X_text = text_values.to_numpy(np.int32)
+    # Reshape the wearable features into images
+    X_image = df[WEARABLE_FEATURES].to_numpy(np.float32).reshape((-1,) + IMG_SHAPE)
     
-    y = df[TARGET].values
+    y = df[TARGET].to_numpy(np.float32)
     
     # Split data
     indices = np.arange(len(y))
@@ -138,7 +181,7 @@ def main():
     
     # Build and train model
     print("\n4. Building model...")
-    model = build_multi_modal_model()
+    model = build_multi_modal_model(env_scaler, wearable_scaler)
     print("   ✅ Model built")
     
     # MLflow setup
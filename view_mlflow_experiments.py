@@ -5,12 +5,129 @@ Script to view and query MLflow experiments and runs.
 import mlflow
 from mlflow.tracking import MlflowClient
 import pandas as pd
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from time import monotonic
+from dateutil.tz import tzlocal
+
+# Most recent runs fetched per experiment in list_experiments
+RECENT_RUNS = 5
+
+# Concurrent search_runs requests when experiments are searched one by one
+MAX_SEARCH_WORKERS = 16
+
+# Seconds experiment lookups are reused for within a session
+EXPERIMENT_CACHE_TTL = 30
+
+# Key metrics and parameters shown in view_experiment_details
+DETAIL_METRICS = ["final_test_mae", "final_test_rmse", "final_test_r2", "overall_mae", "overall_r2"]
+DETAIL_PARAMS = ["training_method", "epochs", "num_clients"]
+_DETAIL_METRIC_KEYS = frozenset(DETAIL_METRICS)
+_DETAIL_PARAM_KEYS = frozenset(DETAIL_PARAMS)
+
+
+# Shared tracking client, created on first use by get_client
+_client = None
+
+
+def get_client():
+    """Return the shared MlflowClient, so its store and HTTP session are reused."""
+    global _client
+    if _client is None:
+        _client = MlflowClient()
+    return _client
+
+
+def _ttl_bucket():
+    """Changes every EXPERIMENT_CACHE_TTL seconds, expiring cached lookups."""
+    return int(monotonic() // EXPERIMENT_CACHE_TTL)
+
+
+@lru_cache(maxsize=1)
+def _search_experiments(ttl_bucket):
+    return get_client().search_experiments()
+
+
+@lru_cache(maxsize=256)
+def _get_experiment_by_name(name, ttl_bucket):
+    return get_client().get_experiment_by_name(name)
+
+
+def search_experiments():
+    """client.search_experiments(), cached for EXPERIMENT_CACHE_TTL seconds."""
+    return _search_experiments(_ttl_bucket())
+
+
+def get_experiment_by_name(name):
+    """client.get_experiment_by_name(), cached for EXPERIMENT_CACHE_TTL seconds."""
+    return _get_experiment_by_name(name, _ttl_bucket())
+
+
+def _recent_runs_by_experiment(client, experiment_ids):
+    """
+    Fetch the RECENT_RUNS latest runs of every experiment, keyed by
+    experiment ID, with one search across all experiments instead of one
+    per experiment. Experiments the shared result limit may have crowded
+    out are topped up with their own searches, run concurrently.
+    """
+    limit = RECENT_RUNS * len(experiment_ids)
+    runs = client.search_runs(
+        experiment_ids=experiment_ids,
+        max_results=limit,
+        order_by=["attributes.start_time DESC"],
+    )
+
+    runs_by_exp = defaultdict(list)
+    for run in runs:
+        exp_runs = runs_by_exp[run.info.experiment_id]
+        if len(exp_runs) < RECENT_RUNS:
+            exp_runs.append(run)
+
+    if len(runs) == limit:
+        short_ids = [
+            exp_id
+            for exp_id in experiment_ids
+            if len(runs_by_exp[exp_id]) < RECENT_RUNS
+        ]
+        if short_ids:
+            # Each search waits on the tracking server, so overlap them
+            with ThreadPoolExecutor(
+                max_workers=min(MAX_SEARCH_WORKERS, len(short_ids))
+            ) as executor:
+                topped_up = executor.map(
+                    lambda exp_id: client.search_runs(
+                        experiment_ids=[exp_id], max_results=RECENT_RUNS
+                    ),
+                    short_ids,
+                )
+                runs_by_exp.update(zip(short_ids, topped_up))
+    return runs_by_exp
+
+
+def iter_runs(client, experiment_id, page_size=1000):
+    """
+    Yield every run of an experiment, one search_runs page at a time, so
+    callers never hold more than a page of full runs in memory.
+    """
+    page_token = None
+    while True:
+        page = client.search_runs(
+            experiment_ids=[experiment_id],
+            max_results=page_size,
+            page_token=page_token,
+        )
+        yield from page
+        page_token = page.token
+        if not page_token:
+            break
+
 
 def list_experiments():
     """List all experiments."""
-    client = MlflowClient()
-    experiments = client.search_experiments()
+    client = get_client()
+    experiments = search_experiments()
     
     print("=" * 80)
     print("MLflow Experiments")
@@ -20,14 +137,18 @@ def list_experiments():
         print("No experiments found.")
         return
     
+    # Get the recent runs of every experiment in one query
+    runs_by_exp = _recent_runs_by_experiment(
+        client, [exp.experiment_id for exp in experiments]
+    )
+    
     for exp in experiments:
         print(f"\n📊 Experiment: {exp.name}")
         print(f"   ID: {exp.experiment_id}")
         print(f"   Artifact Location: {exp.artifact_location}")
         print(f"   Lifecycle Stage: {exp.lifecycle_stage}")
         
-        # Get runs for this experiment
-        runs = client.search_runs(experiment_ids=[exp.experiment_id], max_results=5)
+        runs = runs_by_exp[exp.experiment_id]
         print(f"   Recent Runs: {len(runs)}")
         
         if runs:
@@ -45,10 +166,10 @@ def list_experiments():
 
 def view_experiment_details(experiment_name):
     """View detailed information about a specific experiment."""
-    client = MlflowClient()
+    client = get_client()
     
     try:
-        experiment = client.get_experiment_by_name(experiment_name)
+        experiment = get_experiment_by_name(experiment_name)
         if experiment is None:
             print(f"❌ Experiment '{experiment_name}' not found.")
             return
@@ -57,57 +178,64 @@ def view_experiment_details(experiment_name):
         print(f"Experiment: {experiment_name}")
         print("=" * 80)
         
-        # Get all runs
-        runs = client.search_runs(experiment_ids=[experiment.experiment_id])
+        # Stream all runs page by page, keeping only their summary columns
+        # and the best run (lowest MAE) so far. Key metrics and parameters
+        # are stored sparsely as {row: value}, only for the runs that have them.
+        run_data = {column: [] for column in ["Run ID", "Run Name", "Status", "Start Time"]}
+        detail_data = {key: {} for key in DETAIL_METRICS + DETAIL_PARAMS}
+        best_run = None
+        best_mae = float('inf')
+        for row, run in enumerate(iter_runs(client, experiment.experiment_id)):
+            mae = run.data.metrics.get("final_test_mae", float('inf')) if run.data.metrics else float('inf')
+            if best_run is None or mae < best_mae:
+                best_run, best_mae = run, mae
+            
+            run_data["Run ID"].append(run.info.run_id[:8] + "...")
+            run_data["Run Name"].append(run.info.run_name)
+            run_data["Status"].append(run.info.status)
+            run_data["Start Time"].append(run.info.start_time)
+            
+            # Add the key metrics and parameters this run has
+            metrics = run.data.metrics or {}
+            for key in _DETAIL_METRIC_KEYS & metrics.keys():
+                detail_data[key][row] = metrics[key]
+            params = run.data.params or {}
+            for key in _DETAIL_PARAM_KEYS & params.keys():
+                detail_data[key][row] = params[key]
         
-        print(f"\nTotal Runs: {len(runs)}")
+        print(f"\nTotal Runs: {len(run_data['Run ID'])}")
         
-        if not runs:
+        if not run_data["Run ID"]:
             print("No runs found in this experiment.")
             return
         
-        # Create a summary DataFrame
-        run_data = []
-        for run in runs:
-            run_info = {
-                "Run ID": run.info.run_id[:8] + "...",
-                "Run Name": run.info.run_name,
-                "Status": run.info.status,
-                "Start Time": datetime.fromtimestamp(run.info.start_time/1000).strftime("%Y-%m-%d %H:%M:%S"),
-            }
-            
-            # Add key metrics
-            if run.data.metrics:
-                for key in ["final_test_mae", "final_test_rmse", "final_test_r2", "overall_mae", "overall_r2"]:
-                    if key in run.data.metrics:
-                        run_info[key] = f"{run.data.metrics[key]:.4f}"
-            
-            # Add key parameters
-            if run.data.params:
-                for key in ["training_method", "epochs", "num_clients"]:
-                    if key in run.data.params:
-                        run_info[key] = run.data.params[key]
-            
-            run_data.append(run_info)
-        
+        # Format every start time (epoch ms) as local time in one call
+        run_data["Start Time"] = (
+            pd.to_datetime(run_data["Start Time"], unit="ms", utc=True)
+            .tz_convert(tzlocal())
+            .strftime("%Y-%m-%d %H:%M:%S")
+        )
         df = pd.DataFrame(run_data)
-        print("\n" + df.to_string(index=False))
+        # Only show the metrics and parameters at least one run has (NaN
+        # for the runs that lack them)
+        for key in DETAIL_METRICS + DETAIL_PARAMS:
+            if detail_data[key]:
+                df[key] = pd.Series(detail_data[key], index=df.index)
+        print("\n" + df.to_string(index=False, float_format="{:.4f}".format))
         
         # Show best run
-        if runs:
-            best_run = min(runs, key=lambda r: r.data.metrics.get("final_test_mae", float('inf')) if r.data.metrics else float('inf'))
-            if best_run.data.metrics:
-                print("\n" + "=" * 80)
-                print("🏆 Best Run (Lowest MAE):")
-                print("=" * 80)
-                print(f"   Run Name: {best_run.info.run_name}")
-                print(f"   Run ID: {best_run.info.run_id}")
-                print(f"   Metrics:")
-                for key, value in best_run.data.metrics.items():
-                    print(f"      {key}: {value:.4f}")
-                print(f"   Parameters:")
-                for key, value in best_run.data.params.items():
-                    print(f"      {key}: {value}")
+        if best_run.data.metrics:
+            print("\n" + "=" * 80)
+            print("🏆 Best Run (Lowest MAE):")
+            print("=" * 80)
+            print(f"   Run Name: {best_run.info.run_name}")
+            print(f"   Run ID: {best_run.info.run_id}")
+            print(f"   Metrics:")
+            for key, value in best_run.data.metrics.items():
+                print(f"      {key}: {value:.4f}")
+            print(f"   Parameters:")
+            for key, value in best_run.data.params.items():
+                print(f"      {key}: {value}")
         
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -115,15 +243,21 @@ def view_experiment_details(experiment_name):
 
 def compare_runs(experiment_name, metric="final_test_mae"):
     """Compare runs in an experiment by a specific metric."""
-    client = MlflowClient()
+    client = get_client()
     
     try:
-        experiment = client.get_experiment_by_name(experiment_name)
+        experiment = get_experiment_by_name(experiment_name)
         if experiment is None:
             print(f"❌ Experiment '{experiment_name}' not found.")
             return
         
-        runs = client.search_runs(experiment_ids=[experiment.experiment_id])
+        # Let the tracking store sort by the metric and return only the top
+        # 10; runs without the metric sort last
+        runs = client.search_runs(
+            experiment_ids=[experiment.experiment_id],
+            order_by=[f"metrics.`{metric}` ASC"],
+            max_results=10,
+        )
         
         if not runs:
             print("No runs found.")
@@ -140,46 +274,47 @@ def compare_runs(experiment_name, metric="final_test_mae"):
             print(f"No runs have the metric '{metric}'.")
             return
         
-        # Sort by metric
-        valid_runs.sort(key=lambda r: r.data.metrics[metric])
-        
-        print(f"\n{'Rank':<6} {'Run Name':<30} {metric:<15} {'Status':<10}")
-        print("-" * 80)
-        
-        for i, run in enumerate(valid_runs[:10], 1):
-            metric_value = run.data.metrics[metric]
-            print(f"{i:<6} {run.info.run_name[:30]:<30} {metric_value:<15.4f} {run.info.status:<10}")
+        # Build the ranking table column by column, like view_experiment_details
+        df = pd.DataFrame({
+            "Rank": range(1, len(valid_runs) + 1),
+            "Run Name": [r.info.run_name[:30] for r in valid_runs],
+            metric: [r.data.metrics[metric] for r in valid_runs],
+            "Status": [r.info.status for r in valid_runs],
+        })
+        print("\n" + df.to_string(index=False, float_format="{:.4f}".format))
         
     except Exception as e:
         print(f"❌ Error: {e}")
 
 
 def main():
-    """Main menu."""
-    print("\n" + "=" * 80)
-    print("MLflow Experiment Viewer")
-    print("=" * 80)
-    print("\nOptions:")
-    print("1. List all experiments")
-    print("2. View experiment details")
-    print("3. Compare runs by metric")
-    print("4. Exit")
-    
-    choice = input("\nEnter your choice (1-4): ").strip()
-    
-    if choice == "1":
-        list_experiments()
-    elif choice == "2":
-        exp_name = input("Enter experiment name (e.g., 'health-risk-prediction'): ").strip()
-        view_experiment_details(exp_name)
-    elif choice == "3":
-        exp_name = input("Enter experiment name: ").strip()
-        metric = input("Enter metric name (e.g., 'final_test_mae'): ").strip() or "final_test_mae"
-        compare_runs(exp_name, metric)
-    elif choice == "4":
-        print("Goodbye!")
-    else:
-        print("Invalid choice.")
+    """Main menu, shown again after each choice until the user exits."""
+    while True:
+        print("\n" + "=" * 80)
+        print("MLflow Experiment Viewer")
+        print("=" * 80)
+        print("\nOptions:")
+        print("1. List all experiments")
+        print("2. View experiment details")
+        print("3. Compare runs by metric")
+        print("4. Exit")
+        
+        choice = input("\nEnter your choice (1-4): ").strip()
+        
+        if choice == "1":
+            list_experiments()
+        elif choice == "2":
+            exp_name = input("Enter experiment name (e.g., 'health-risk-prediction'): ").strip()
+            view_experiment_details(exp_name)
+        elif choice == "3":
+            exp_name = input("Enter experiment name: ").strip()
+            metric = input("Enter metric name (e.g., 'final_test_mae'): ").strip() or "final_test_mae"
+            compare_runs(exp_name, metric)
+        elif choice == "4":
+            print("Goodbye!")
+            break
+        else:
+            print("Invalid choice.")
 
 
 if __name__ == "__main__":